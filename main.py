@@ -1,9 +1,21 @@
 import os
 from dotenv import load_dotenv
-from curl_cffi import requests
+from curl_cffi import CurlHttpVersion
+from curl_cffi.requests import AsyncSession
 import asyncio
+import ciso8601
+import collections
+import contextlib
 import datetime
 import logging
+import orjson
+import sqlite3
+import time
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
 
 # --- Logging setup ---
 logging.basicConfig(
@@ -21,8 +33,24 @@ USER_IDS = [
 ]
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"
 
+# Overridden by mock_server.py to run the bot against its local mock API
+BASE_URL = os.getenv("POLPUMP_BASE_URL", "https://hot-data.politicalpump.com")
+
+TELEGRAM_URL = f"https://api.telegram.org/bot{TELEGRAM_API_KEY}/sendMessage"
+TELEGRAM_HEADERS = {"Content-Type": "application/json"}
+UPCOMING_URL = f"{BASE_URL}/tokens?is_upcoming=true&page=1&page_size=50&sort_order=asc&sort_by=start_time"
+TOKENS_URL = f"{BASE_URL}/tokens?page=1&page_size=50&sort_order=asc&sort_by=start_time"
+
 # In-memory state for watched tokens
-WATCHED_TOKENS = {}  # key: token_id, value: dict with start_time, notified, contract_address_sent, monitoring_started
+WATCHED_TOKENS = {}  # key: token_id, value: dict with start_time, start_ts, notified, contract_address_sent, monitoring_started
+# Tokens whose release was already sent, kept until they expire so a poll
+# made before their start_time cannot watch and announce them again
+SENT_TOKENS = {}  # key: token_id, value: start_ts
+# Set whenever a token is handed over to the release monitor
+MONITOR_WAKEUP = asyncio.Event()
+
+# On-disk log of watched tokens so a restart does not drop pending releases
+STATE_DB_PATH = os.getenv("POLPARSE_STATE_DB", "state.db")
 
 
 def ensure_utc(dt):
@@ -35,80 +63,259 @@ def format_human_datetime(dt):
     return dt.strftime("%Y-%m-%d %H:%M UTC")
 
 
+# --- Watched token persistence ---
+def open_state_db(path):
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS watched"
+        " (id PRIMARY KEY, start_time TEXT, start_ts REAL, name TEXT, symbol TEXT,"
+        " sent INTEGER NOT NULL DEFAULT 0)"
+    )
+    return db
+
+
+def save_watched_token(db, token_id, info):
+    with db:
+        db.execute(
+            "INSERT OR IGNORE INTO watched VALUES (?, ?, ?, ?, ?, 0)",
+            (
+                token_id,
+                info["start_time"].isoformat(),
+                info["start_ts"],
+                info["name"],
+                info["symbol"],
+            ),
+        )
+
+
+def mark_token_sent(db, token_id):
+    with db:
+        db.execute("UPDATE watched SET sent = 1 WHERE id = ?", (token_id,))
+
+
+def load_watched_tokens(db):
+    # Discard expired rows, then restore the rest; sent rows are kept so the
+    # startup poll does not announce those tokens again
+    with db:
+        db.execute("DELETE FROM watched WHERE start_ts + 3600 <= ?", (time.time(),))
+    rows = db.execute(
+        "SELECT id, start_time, start_ts, name, symbol, sent FROM watched"
+    ).fetchall()
+    for token_id, start_time, start_ts, name, symbol, sent in rows:
+        if sent:
+            SENT_TOKENS[token_id] = start_ts
+            continue
+        WATCHED_TOKENS[token_id] = {
+            "start_time": ciso8601.parse_datetime(start_time),
+            "start_ts": start_ts,
+            "notified": False,
+            "contract_address_sent": False,
+            "monitoring_started": False,
+            "name": name,
+            "symbol": symbol,
+        }
+    return len(WATCHED_TOKENS)
+
+
+# --- Telegram rate limiting ---
+# Allows at most `burst` entries per sliding `window` seconds
+class RateLimiter:
+    def __init__(self, burst, window):
+        self.burst = burst
+        self.window = window
+        self._sent = collections.deque()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                while self._sent and now - self._sent[0] >= self.window:
+                    self._sent.popleft()
+                if len(self._sent) < self.burst:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(self._sent[0] + self.window - now)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+# Telegram allows roughly 30 messages per second across all chats
+TELEGRAM_LIMITER = RateLimiter(burst=30, window=1.0)
+# Retries after a 429 before a message is dropped, so a long retry_after
+# cannot stall the caller indefinitely
+TELEGRAM_MAX_RETRIES = 3
+
+
 # --- Telegram notification function ---
-def send_telegram_message(user_id, text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_API_KEY}/sendMessage"
-    data = {"chat_id": user_id, "text": text}
+async def send_telegram_message(session, user_id, body_template):
+    # body_template holds every sendMessage field except chat_id
+    payload = orjson.dumps({**body_template, "chat_id": user_id})
     try:
-        resp = requests.post(url, data=data)
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            async with TELEGRAM_LIMITER:
+                resp = await session.post(
+                    TELEGRAM_URL, data=payload, headers=TELEGRAM_HEADERS
+                )
+            if resp.status_code != 429:
+                break
+            if attempt == TELEGRAM_MAX_RETRIES:
+                logger.error(
+                    "Giving up on Telegram message to %s after %d rate-limited retries.",
+                    user_id,
+                    TELEGRAM_MAX_RETRIES,
+                )
+                return
+            # Telegram says how long to back off before the next attempt
+            retry_after = (
+                orjson.loads(resp.content).get("parameters", {}).get("retry_after", 1)
+            )
+            logger.warning(
+                "Telegram rate limit hit for %s, retrying in %ss.", user_id, retry_after
+            )
+            await asyncio.sleep(retry_after)
         resp.raise_for_status()
-        logger.info(f"Sent Telegram message to {user_id}: {text}")
+        logger.info("Sent Telegram message to %s: %s", user_id, body_template["text"])
     except Exception as e:
-        logger.error(f"Failed to send Telegram message to {user_id}: {e}")
+        logger.error("Failed to send Telegram message to %s: %s", user_id, e)
+
+
+async def broadcast_telegram_message(session, text):
+    # Send to all users concurrently rather than one round-trip after another
+    body_template = {"text": text}
+    await asyncio.gather(
+        *[send_telegram_message(session, uid, body_template) for uid in USER_IDS],
+        return_exceptions=True,
+    )
 
 
 # --- Poll the API for upcoming tokens every 3 hours ---
-async def poll_upcoming_tokens():
+async def poll_upcoming_tokens(session, db):
     while True:
         try:
             logger.info("Polling for upcoming tokens...")
-            response = requests.get(
-                "https://hot-data.politicalpump.com/tokens?is_upcoming=true&page=1&page_size=50&sort_order=asc&sort_by=start_time",
-                headers={"User-Agent": USER_AGENT},
-            )
-            tokens = response.json().get("items", [])
+            response = await session.get(UPCOMING_URL)
+            tokens = orjson.loads(response.content).get("items", [])
             now = datetime.datetime.now(datetime.UTC)
-            logger.info(f"Found {len(tokens)} upcoming tokens.")
+            logger.info("Found %d upcoming tokens.", len(tokens))
             for token in tokens:
                 token_id = token["_id"]
-                start_time = ensure_utc(
-                    datetime.datetime.fromisoformat(token["start_time"])
-                )
-                if token_id not in WATCHED_TOKENS and start_time > now:
+                start_time = ensure_utc(ciso8601.parse_datetime(token["start_time"]))
+                if (
+                    token_id not in WATCHED_TOKENS
+                    and token_id not in SENT_TOKENS
+                    and start_time > now
+                ):
                     WATCHED_TOKENS[token_id] = {
                         "start_time": start_time,
+                        "start_ts": start_time.timestamp(),
                         "notified": False,
                         "contract_address_sent": False,
                         "monitoring_started": False,
                         "name": token.get("name", "?"),
                         "symbol": token.get("symbol", "?"),
                     }
+                    release_at = format_human_datetime(start_time)
                     logger.info(
-                        f"Added token {token.get('name', '?')} ({token.get('symbol', '?')}) to watch queue for {format_human_datetime(start_time)}."
+                        "Added token %s (%s) to watch queue for %s.",
+                        token.get("name", "?"),
+                        token.get("symbol", "?"),
+                        release_at,
                     )
+                    save_watched_token(db, token_id, WATCHED_TOKENS[token_id])
+                    asyncio.create_task(schedule_monitoring(WATCHED_TOKENS[token_id]))
                     # Notify users about new token being watched
-                    for uid in USER_IDS:
-                        send_telegram_message(
-                            uid,
-                            f"Watching token {token.get('name', '?')} ({token.get('symbol', '?')}) for release at {format_human_datetime(start_time)}",
-                        )
+                    await broadcast_telegram_message(
+                        session,
+                        f"Watching token {token.get('name', '?')} ({token.get('symbol', '?')}) for release at {release_at}",
+                    )
         except Exception as e:
-            logger.error(f"Error polling upcoming tokens: {e}")
+            logger.error("Error polling upcoming tokens: %s", e)
         await asyncio.sleep(3 * 60 * 60)  # 3 hours
 
 
-# --- Monitor a specific token for contract address release ---
-async def monitor_token_release(token_id, token_info):
-    now = datetime.datetime.now(datetime.UTC)
-    wait_seconds = (token_info["start_time"] - now).total_seconds() - 60
-    if wait_seconds > 0:
+# --- Hand a token over to the release monitor 1 hour before start ---
+async def schedule_monitoring(info):
+    wait_seconds = info["start_ts"] - time.time() - 3600
+    await asyncio.sleep(max(wait_seconds, 0))
+    info["monitoring_started"] = True
+    MONITOR_WAKEUP.set()
+    if logger.isEnabledFor(logging.INFO):
         logger.info(
-            f"Token {token_info['name']} ({token_info['symbol']}) monitoring will start in {wait_seconds:.1f} seconds."
+            "Started monitoring for token %s (%s) releasing at %s.",
+            info["name"],
+            info["symbol"],
+            format_human_datetime(info["start_time"]),
         )
-        await asyncio.sleep(wait_seconds)
-    logger.info(
-        f"Started frequent monitoring for token {token_info['name']} ({token_info['symbol']})..."
-    )
-    # Poll every 2 seconds until contract_address is found
-    while not token_info["contract_address_sent"]:
+
+
+# --- Monitor every watched token for contract address release ---
+async def monitor_all(session, db):
+    # One shared loop fetches the listing once per tick and checks every
+    # token in its release window against it
+    etag = None
+    etag_due = set()
+    interval = 2
+    while True:
+        now = time.time()
+        # Forget tokens an hour past their start that never got an address
+        for token_id, info in list(WATCHED_TOKENS.items()):
+            if info["start_ts"] + 3600 < now:
+                logger.info(
+                    "Dropping token %s (%s): no contract address an hour after release.",
+                    info["name"],
+                    info["symbol"],
+                )
+                del WATCHED_TOKENS[token_id]
+        for token_id, start_ts in list(SENT_TOKENS.items()):
+            if start_ts + 3600 < now:
+                del SENT_TOKENS[token_id]
+        pending = {
+            token_id: info
+            for token_id, info in WATCHED_TOKENS.items()
+            if info["monitoring_started"] and not info["contract_address_sent"]
+        }
+        due = {
+            token_id: info
+            for token_id, info in pending.items()
+            if info["start_ts"] - now <= 60
+        }
+        if not due:
+            # Idle until the next release window opens or a new token is
+            # handed over, whichever comes first
+            wait_seconds = min(
+                (info["start_ts"] - now - 60 for info in pending.values()),
+                default=60,
+            )
+            try:
+                await asyncio.wait_for(
+                    MONITOR_WAKEUP.wait(), timeout=max(wait_seconds, 0)
+                )
+            except TimeoutError:
+                pass
+            finally:
+                MONITOR_WAKEUP.clear()
+            continue
+        # A cached listing only covers the tokens it was checked against
+        if due.keys() != etag_due:
+            etag = None
+            etag_due = set(due)
         try:
-            response = requests.get(
-                "https://hot-data.politicalpump.com/tokens?page=1&page_size=50&sort_order=asc&sort_by=start_time",
-                headers={"User-Agent": USER_AGENT},
+            response = await session.get(
+                TOKENS_URL, headers={"If-None-Match": etag} if etag else None
             )
-            tokens = response.json().get("items", [])
-            for token in tokens:
-                if token["_id"] == token_id and token.get("contract_address"):
+            # 304 means the listing is unchanged since the last poll
+            if response.status_code != 304:
+                response.raise_for_status()
+                tokens = orjson.loads(response.content).get("items", [])
+                by_id = {t["_id"]: t for t in tokens}
+                for token_id, info in due.items():
+                    token = by_id.get(token_id)
+                    if token is None or not token.get("contract_address"):
+                        continue
                     contract_address = token["contract_address"]
                     if (
                         contract_address
@@ -116,41 +323,58 @@ async def monitor_token_release(token_id, token_info):
                         and contract_address.strip()
                     ):
                         logger.info(
-                            f"Token {token.get('name', '?')} released! Contract address: {contract_address}"
+                            "Token %s released! Contract address: %s",
+                            token.get("name", "?"),
+                            contract_address,
                         )
-                        for uid in USER_IDS:
-                            send_telegram_message(
-                                uid,
-                                f"🚨 TOKEN RELEASED! 🚨\nName: {token.get('name', '?')} ({token.get('symbol', '?')})\nContract Address: \n```\n{contract_address}\n```\nRelease Time: {format_human_datetime(token_info['start_time'])}",
-                            )
-                        token_info["contract_address_sent"] = True
-                        break
+                        await broadcast_telegram_message(
+                            session,
+                            f"🚨 TOKEN RELEASED! 🚨\nName: {token.get('name', '?')} ({token.get('symbol', '?')})\nContract Address: \n```\n{contract_address}\n```\nRelease Time: {format_human_datetime(info['start_time'])}",
+                        )
+                        info["contract_address_sent"] = True
+                        mark_token_sent(db, token_id)
+                        SENT_TOKENS[token_id] = info["start_ts"]
+                        WATCHED_TOKENS.pop(token_id, None)
+                # Only trust the ETag once its listing has been fully handled
+                etag = response.headers.get("ETag")
         except Exception as e:
-            logger.error(f"Error monitoring token {token_id}: {e}")
-        await asyncio.sleep(2)
+            logger.error("Error monitoring tokens: %s", e)
+        # Tight 1s cadence within 60s of a start_time, exponential backoff
+        # outside it, capped low so a late release is still reported quickly
+        if any(abs(info["start_ts"] - now) <= 60 for info in due.values()):
+            interval = 2
+            await asyncio.sleep(1)
+        else:
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, 5)
 
 
 # --- Main async loop ---
-async def main():
+async def main(state_db_path=STATE_DB_PATH):
     logger.info("Starting main event loop.")
-    # Start the periodic polling task
-    asyncio.create_task(poll_upcoming_tokens())
-    while True:
-        now = datetime.datetime.now(datetime.UTC)
-        # Start monitoring tasks for tokens whose start_time is near and not yet being monitored
-        for token_id, info in list(WATCHED_TOKENS.items()):
-            if (
-                not info.get("monitoring_started")
-                and (info["start_time"] - now).total_seconds() < 3600  # 1 hour before
-            ):
-                info["monitoring_started"] = True
-                logger.info(
-                    f"Scheduling monitoring for token {info['name']} ({info['symbol']}) at {format_human_datetime(info['start_time'])}."
-                )
-                asyncio.create_task(monitor_token_release(token_id, info))
-        await asyncio.sleep(30)
+    with contextlib.closing(open_state_db(state_db_path)) as db:
+        restored = load_watched_tokens(db)
+        if restored:
+            logger.info("Restored %d watched tokens from disk.", restored)
+        # One pooled session shared by every poll and send, so requests reuse
+        # keep-alive connections instead of paying a TCP+TLS handshake each
+        # time. HTTP/2 over TLS lets concurrent Telegram sends multiplex on
+        # one stream.
+        async with AsyncSession(
+            headers={"User-Agent": USER_AGENT},
+            impersonate="chrome",
+            http_version=CurlHttpVersion.V2TLS,
+        ) as session:
+            for info in WATCHED_TOKENS.values():
+                asyncio.create_task(schedule_monitoring(info))
+            # Start the periodic polling task and run the release monitor
+            asyncio.create_task(poll_upcoming_tokens(session, db))
+            await monitor_all(session, db)
 
 
 if __name__ == "__main__":
     logger.info("Bot started.")
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,103 @@
+import os
+import asyncio
+import datetime
+import hashlib
+import orjson
+from aiohttp import web
+
+# Always route the bot at this mock, whatever the shell exports, before
+# main.py reads its configuration
+os.environ["POLPUMP_BASE_URL"] = "http://127.0.0.1:5000"
+import main  # noqa: E402
+
+# --- Mock Political Pump API using aiohttp ---
+MOCK_TOKENS = [
+    {
+        "_id": 1,
+        "name": "TestToken",
+        "symbol": "TST",
+        "start_time": (
+            datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(seconds=30)
+        ).isoformat(),
+        "contract_address": None,
+        "description": "A test token.",
+        "image": {},
+        "publishedAt": None,
+        "sol_pair_address": None,
+        "swap_link": None,
+        "wikipedia_link": None,
+        "fdv": None,
+        "history24hPrice": None,
+        "holder": None,
+        "lastTradeUnixTime": None,
+        "liquidity": None,
+        "marketCap": None,
+        "price": None,
+        "priceChange24hPercent": None,
+        "totalSupply": None,
+        "v24h": None,
+        "v24hUSD": None,
+        "vBuy24h": None,
+        "vBuy24hUSD": None,
+        "vSell24h": None,
+        "vSell24hUSD": None,
+        "up_votes": 0,
+        "down_votes": 0,
+        "net_votes": 0,
+        "opinions_count": 0,
+        "opinions": {},
+        "opinions_percentages": {},
+        "avg_opinion": "Center",
+        "status": "live",
+    }
+]
+
+MOCK_CONTRACT_RELEASE_DELAY = 5  # seconds after start_time to set contract_address
+
+
+async def tokens(request):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    # Simulate contract address release
+    for token in MOCK_TOKENS:
+        start_time = datetime.datetime.fromisoformat(token["start_time"])
+        if (
+            token["contract_address"] is None
+            and (now - start_time).total_seconds() > MOCK_CONTRACT_RELEASE_DELAY
+        ):
+            token["contract_address"] = "0xMOCKEDCONTRACTADDRESS"
+    items = list(MOCK_TOKENS)
+    body = orjson.dumps(
+        {
+            "items": items,
+            "total": len(items),
+            "page": 1,
+            "page_size": 10,
+            "total_pages": 1,
+        }
+    )
+    # Serve an ETag and honour If-None-Match like a caching upstream would
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.Response(
+        body=body, content_type="application/json", headers={"ETag": etag}
+    )
+
+
+# --- Serve the mock and run the bot against it in one event loop ---
+async def run():
+    app = web.Application()
+    app.router.add_get("/tokens", tokens)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 5000).start()
+    try:
+        # Throwaway state so mock runs leave nothing on disk
+        await main.main(":memory:")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())